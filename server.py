@@ -1,6 +1,7 @@
-from fastapi import FastAPI, Depends, status
+from fastapi import FastAPI, Depends, Header, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from typing import Optional
 import uvicorn
 from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
@@ -12,6 +13,8 @@ from src.database import init_db, get_async_session
 from src.models.user import User
 from src.controllers.user_controller import UserController
 from src.middleware.auth import admin_required, get_current_user
+from src.middleware.idempotency import IdempotencyStore
+from src.middleware.single_flight import single_flight_stats
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,15 +41,30 @@ app.add_middleware(
 # Instance du contrôleur utilisateur
 user_controller = UserController()
 
+# Stockage des réponses pour l'en-tête Idempotency-Key
+idempotency_store = IdempotencyStore()
+
 # Routes publiques
 @app.get("/")
 async def root():
     return {"message": "API Backend Ynov - Python FastAPI"}
 
 @app.post("/v1/users", status_code=status.HTTP_201_CREATED)
-async def add_user(user_data: dict, db: AsyncSession = Depends(get_async_session)):
-    """Créer un nouvel utilisateur"""
-    return await user_controller.add_user(user_data, db)
+async def add_user(
+    user_data: dict,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Créer un nouvel utilisateur (les réessais avec le même Idempotency-Key rejouent la réponse)"""
+    if idempotency_key is None:
+        return await user_controller.add_user(user_data, db)
+    result, replayed = await idempotency_store.execute(
+        idempotency_key, user_data, lambda: user_controller.add_user(user_data, db)
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
 @app.post("/v1/login")
 async def login(login_data: dict, db: AsyncSession = Depends(get_async_session)):
@@ -69,6 +87,11 @@ async def delete_user(user_id: int, current_user: User = Depends(admin_required)
     """Supprimer un utilisateur"""
     return await user_controller.delete_user(user_id, current_user, db)
 
+@app.get("/v1/metrics")
+async def get_metrics(current_user: User = Depends(admin_required)):
+    """Compteurs de regroupement des requêtes de lecture concurrentes"""
+    return {"singleFlight": single_flight_stats()}
+
 # Route protégée : utilisateur connecté
 @app.get("/v1/profile")
 async def get_profile(current_user: User = Depends(get_current_user)):
@@ -3,15 +3,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from src.models.user import User, get_password_hash, verify_password, UserRole
 from src.middleware.auth import create_access_token
+from src.middleware.single_flight import users_flight
 
 class UserController:
+    async def _fetch_users(self, db: AsyncSession, public_only: bool) -> dict:
+        """Requête partagée par les lectures concurrentes de la liste des utilisateurs"""
+        result = await db.execute(select(User))
+        users = result.scalars().all()
+        users_list = [user.to_camel_dict(public_only=public_only) for user in users]
+        return {"utilisateurs": users_list}
+
     async def get_all_users(self, db: AsyncSession) -> dict:
         """Récupérer la liste de tous les utilisateurs (infos de base, accessible à tous)"""
         try:
-            result = await db.execute(select(User))
-            users = result.scalars().all()
-            users_list = [user.to_camel_dict() for user in users]
-            return {"utilisateurs": users_list}
+            return await users_flight.do("public", lambda: self._fetch_users(db, public_only=True))
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -142,10 +147,7 @@ class UserController:
                 detail="Accès réservé à l'administrateur."
             )
         try:
-            result = await db.execute(select(User))
-            users = result.scalars().all()
-            users_list = [user.to_camel_dict(public_only=False) for user in users]
-            return {"utilisateurs": users_list}
+            return await users_flight.do("sensitive", lambda: self._fetch_users(db, public_only=False))
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
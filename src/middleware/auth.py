@@ -3,12 +3,14 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, inspect
+from sqlalchemy.orm import make_transient_to_detached
 import os
 from typing import Optional
 
 from src.database import get_async_session
 from src.models.user import User
+from src.middleware.single_flight import auth_flight
 
 # Configuration JWT
 SECRET_KEY = os.getenv("JWT_SECRET")
@@ -28,6 +30,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+async def _fetch_user(user_id: int, db: AsyncSession) -> Optional[dict]:
+    """Chercher un utilisateur par son ID et renvoyer les valeurs de ses colonnes"""
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_async_session)
@@ -52,13 +62,16 @@ async def get_current_user(
         user_id_int = int(user_id)
         
         # Chercher l'utilisateur dans la base
-        result = await db.execute(select(User).where(User.id == user_id_int))
-        user = result.scalar_one_or_none()
+        # Les requêtes concurrentes pour le même utilisateur partagent une seule requête SQL
+        values = await auth_flight.do(user_id_int, lambda: _fetch_user(user_id_int, db))
         
-        if user is None:
+        if values is None:
             raise credentials_exception
         
-        return user
+        # Chaque requête rattache sa propre instance à sa session, sans nouvelle requête SQL
+        user = User(**values)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
     except ValueError:
         # Si la conversion en int échoue
         raise credentials_exception
@@ -0,0 +1,101 @@
+from fastapi import HTTPException, status
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+from src.middleware.single_flight import SingleFlight
+
+# Configuration des clés d'idempotence
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "1000"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Clé HMAC aléatoire propre au processus (le stockage est lui aussi propre au processus)
+_FINGERPRINT_KEY = secrets.token_bytes(32)
+
+class IdempotencyStore:
+    """Stockage borné (LRU + TTL) des réponses associées à une clé d'idempotence.
+
+    Le stockage est en mémoire : il est propre à chaque processus uvicorn.
+    """
+
+    def __init__(self, max_keys: int = IDEMPOTENCY_MAX_KEYS, ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        # clé -> (expiration, empreinte de la requête, réponse)
+        self._responses: "OrderedDict[str, tuple[float, str, dict]]" = OrderedDict()
+        # clé -> empreinte de la requête en cours de traitement
+        self._in_flight: dict[str, str] = {}
+        self._flight = SingleFlight("idempotency")
+
+    @staticmethod
+    def fingerprint(payload: dict) -> str:
+        """Calculer l'empreinte HMAC d'un corps de requête (qui contient le mot de passe)"""
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hmac.new(_FINGERPRINT_KEY, raw.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _get(self, key: str) -> Optional[tuple[str, dict]]:
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+        expires_at, fingerprint, response = entry
+        if expires_at <= time.monotonic():
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return fingerprint, response
+
+    def _set(self, key: str, fingerprint: str, response: dict):
+        self._responses[key] = (time.monotonic() + self.ttl_seconds, fingerprint, response)
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_keys:
+            self._responses.popitem(last=False)
+
+    @staticmethod
+    def _check_fingerprint(expected: str, fingerprint: str):
+        if expected != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Cette clé d'idempotence a déjà été utilisée avec une requête différente"
+            )
+
+    async def execute(self, key: str, payload: dict, func: Callable[[], Awaitable[dict]]) -> tuple[dict, bool]:
+        """Exécuter func une seule fois par clé et renvoyer (réponse, rejouée)"""
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"L'en-tête Idempotency-Key doit contenir entre 1 et {IDEMPOTENCY_KEY_MAX_LENGTH} caractères"
+            )
+        fingerprint = self.fingerprint(payload)
+
+        # Réponse déjà connue : on la rejoue sans rien recalculer
+        cached = self._get(key)
+        if cached is not None:
+            self._check_fingerprint(cached[0], fingerprint)
+            return cached[1], True
+
+        # Même clé déjà en cours de traitement : on attend le résultat de la première requête
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._check_fingerprint(in_flight, fingerprint)
+
+        # Seule la requête qui exécute func voit sa propre marque revenir (replayed=False)
+        owner = object()
+
+        async def run() -> tuple[dict, object]:
+            self._in_flight[key] = fingerprint
+            try:
+                # Les erreurs ne sont pas mémorisées : le client peut réessayer avec la même clé
+                response = await func()
+            finally:
+                self._in_flight.pop(key, None)
+            self._set(key, fingerprint, response)
+            return response, owner
+
+        response, executed_by = await self._flight.do(key, run)
+        return response, executed_by is not owner
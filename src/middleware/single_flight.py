@@ -0,0 +1,62 @@
+from typing import Any, Awaitable, Callable, Hashable
+import asyncio
+
+class SingleFlight:
+    """Regrouper les appels concurrents identiques (même clé) en un seul appel en cours.
+
+    Les requêtes qui arrivent pendant qu'un appel est en cours attendent et partagent
+    son résultat (ou son exception). Rien n'est mis en cache une fois l'appel terminé.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Exécuter func, ou attendre l'appel déjà en cours pour la même clé"""
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # L'appel partagé a été annulé (client déconnecté) : on prend le relais
+                if not future.cancelled():
+                    raise
+                return await self.do(key, func)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executions += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        """Compteurs exposés par la route /v1/metrics"""
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "inFlight": len(self._in_flight)
+        }
+
+# Groupes utilisés par les routes de lecture
+users_flight = SingleFlight("users")
+auth_flight = SingleFlight("auth")
+
+def single_flight_stats() -> dict:
+    """Récupérer les compteurs de tous les groupes"""
+    return {group.name: group.stats() for group in (users_flight, auth_flight)}
@@ -87,6 +87,29 @@ class TestCreateUser:
         if response.status_code == 201 and "user" in response.json():
             assert "password" not in response.json()["user"]
 
+    def test_create_user_idempotency_key_replay(self):
+        """POST /v1/users rejoué avec le même Idempotency-Key doit renvoyer la réponse initiale"""
+        unique_username = f"idempotent_{int(time.time() * 1000)}"
+        payload = {"username": unique_username, "password": "idempotentpass"}
+        headers = {"Idempotency-Key": f"key-{unique_username}"}
+        first = client.post("/v1/users", json=payload, headers=headers)
+        assert first.status_code in [201, 500]
+        if first.status_code == 201:
+            second = client.post("/v1/users", json=payload, headers=headers)
+            assert second.status_code == 201
+            assert second.headers.get("Idempotent-Replayed") == "true"
+            assert second.json() == first.json()
+
+    def test_create_user_idempotency_key_other_payload(self):
+        """POST /v1/users avec un Idempotency-Key déjà utilisé pour un autre corps doit renvoyer 422"""
+        unique_username = f"idempotent_{int(time.time() * 1000)}"
+        headers = {"Idempotency-Key": f"key-{unique_username}"}
+        first = client.post("/v1/users", json={"username": unique_username, "password": "pass"}, headers=headers)
+        assert first.status_code in [201, 500]
+        if first.status_code == 201:
+            second = client.post("/v1/users", json={"username": f"{unique_username}_2", "password": "pass"}, headers=headers)
+            assert second.status_code == 422
+
 class TestGetUsers:
     """Tests de récupération d'utilisateurs"""
     
@@ -138,6 +161,32 @@ class TestGetUsers:
             assert "utilisateurs" in data
             assert isinstance(data["utilisateurs"], list)
 
+class TestMetrics:
+    """Tests des compteurs de regroupement des lectures"""
+
+    def test_metrics_no_auth(self):
+        """GET /v1/metrics sans token doit renvoyer 401 ou 403"""
+        response = client.get("/v1/metrics")
+        assert response.status_code in [401, 403]
+
+    def test_metrics_admin_success(self):
+        """GET /v1/metrics avec token admin doit exposer les compteurs"""
+        login_response = client.post("/v1/login", json={
+            "username": "loise.fenoll@ynov.com",
+            "password": "PvdrTAzTeR247sDnAZBr"
+        })
+
+        if login_response.status_code == 200:
+            token = login_response.json().get("token")
+            response = client.get("/v1/metrics", headers={
+                "Authorization": f"Bearer {token}"
+            })
+            assert response.status_code == 200
+            data = response.json()
+            assert "singleFlight" in data
+            for group in ("users", "auth"):
+                assert set(data["singleFlight"][group]) == {"executions", "coalesced", "inFlight"}
+
 class TestDeleteUser:
     """Tests de suppression d'utilisateur"""
     
@@ -0,0 +1,150 @@
+import pytest
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from src.middleware.idempotency import IdempotencyStore
+
+class Counter:
+    """Coroutine lente qui compte ses exécutions (remplace add_user)"""
+
+    def __init__(self, delay: float = 0.05, error: Exception = None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"message": "Utilisateur créé", "user": {"_id": self.calls}}
+
+class TestIdempotencyStore:
+    """Tests du stockage des clés d'idempotence"""
+
+    def test_concurrent_requests_run_once(self):
+        """Les requêtes concurrentes avec la même clé n'exécutent le traitement qu'une fois"""
+        store = IdempotencyStore()
+        counter = Counter()
+
+        async def scenario():
+            return await asyncio.gather(*[store.execute("key", {"username": "u"}, counter) for _ in range(5)])
+
+        results = asyncio.run(scenario())
+        assert counter.calls == 1
+        assert all(response == results[0][0] for response, _ in results)
+        assert [replayed for _, replayed in results].count(False) == 1
+        assert [replayed for _, replayed in results].count(True) == 4
+
+    def test_replay_does_not_execute(self):
+        """Une requête rejouée renvoie la réponse initiale sans rien exécuter"""
+        store = IdempotencyStore()
+        counter = Counter(delay=0)
+
+        async def scenario():
+            first = await store.execute("key", {"username": "u"}, counter)
+            second = await store.execute("key", {"username": "u"}, counter)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert counter.calls == 1
+        assert first == (second[0], False)
+        assert second[1] is True
+
+    def test_other_payload_rejected(self):
+        """Réutiliser une clé avec un autre corps doit renvoyer 422"""
+        store = IdempotencyStore()
+        counter = Counter(delay=0)
+
+        async def scenario():
+            await store.execute("key", {"username": "u"}, counter)
+            await store.execute("key", {"username": "other"}, counter)
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(scenario())
+        assert exc_info.value.status_code == 422
+        assert counter.calls == 1
+
+    def test_invalid_key_rejected(self):
+        """Une clé vide ou trop longue doit renvoyer 400"""
+        store = IdempotencyStore()
+        for key in ("", "k" * 256):
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(store.execute(key, {}, Counter(delay=0)))
+            assert exc_info.value.status_code == 400
+
+    def test_errors_are_not_cached(self):
+        """Une erreur est partagée par les requêtes concurrentes mais n'est pas mémorisée"""
+        store = IdempotencyStore()
+        failing = Counter(error=ValueError("boom"))
+
+        async def scenario():
+            return await asyncio.gather(
+                *[store.execute("key", {}, failing) for _ in range(3)], return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        assert failing.calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+
+        counter = Counter(delay=0)
+        response, replayed = asyncio.run(store.execute("key", {}, counter))
+        assert counter.calls == 1
+        assert replayed is False
+
+    def test_waiter_takes_over_when_owner_cancelled(self):
+        """Si la première requête est annulée, une requête en attente exécute le traitement"""
+        store = IdempotencyStore()
+        counter = Counter()
+
+        async def scenario():
+            owner = asyncio.create_task(store.execute("key", {}, counter))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(store.execute("key", {}, counter))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            return await waiter
+
+        response, replayed = asyncio.run(scenario())
+        assert counter.calls == 2
+        assert replayed is False
+        assert response["user"]["_id"] == 2
+
+    def test_lru_eviction(self):
+        """Au-delà de max_keys, la clé la moins récemment utilisée est oubliée"""
+        store = IdempotencyStore(max_keys=2)
+        counter = Counter(delay=0)
+
+        async def scenario():
+            await store.execute("a", {}, counter)
+            await store.execute("b", {}, counter)
+            await store.execute("a", {}, counter)  # "a" devient la plus récente
+            await store.execute("c", {}, counter)  # "b" est évincée
+            _, replayed_a = await store.execute("a", {}, counter)
+            _, replayed_b = await store.execute("b", {}, counter)
+            return replayed_a, replayed_b
+
+        replayed_a, replayed_b = asyncio.run(scenario())
+        assert replayed_a is True
+        assert replayed_b is False
+        assert counter.calls == 4
+
+    def test_ttl_expiration(self):
+        """Une réponse expirée n'est plus rejouée"""
+        store = IdempotencyStore(ttl_seconds=0)
+        counter = Counter(delay=0)
+
+        async def scenario():
+            await store.execute("key", {}, counter)
+            return await store.execute("key", {}, counter)
+
+        _, replayed = asyncio.run(scenario())
+        assert replayed is False
+        assert counter.calls == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+import pytest
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.middleware.single_flight import SingleFlight
+
+CALLERS = 10
+
+class SlowQuery:
+    """Coroutine lente qui compte ses exécutions (remplace une requête SQL)"""
+
+    def __init__(self, delay: float = 0.05, error: Exception = None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"utilisateurs": [], "call": self.calls}
+
+class TestSingleFlight:
+    """Tests du regroupement des lectures concurrentes"""
+
+    def test_concurrent_calls_are_coalesced(self):
+        """Les appels concurrents sur une même clé partagent une seule exécution"""
+        flight = SingleFlight("test")
+        query = SlowQuery()
+
+        async def scenario():
+            return await asyncio.gather(*[flight.do("users", query) for _ in range(CALLERS)])
+
+        results = asyncio.run(scenario())
+        assert query.calls == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats() == {"executions": 1, "coalesced": CALLERS - 1, "inFlight": 0}
+
+    def test_different_keys_are_not_coalesced(self):
+        """Des clés différentes donnent des exécutions distinctes"""
+        flight = SingleFlight("test")
+        query = SlowQuery()
+
+        async def scenario():
+            return await asyncio.gather(flight.do(1, query), flight.do(2, query))
+
+        asyncio.run(scenario())
+        assert query.calls == 2
+        assert flight.stats()["coalesced"] == 0
+
+    def test_results_are_not_cached(self):
+        """Un appel après la fin du précédent relance la requête"""
+        flight = SingleFlight("test")
+        query = SlowQuery(delay=0)
+
+        async def scenario():
+            await flight.do("users", query)
+            return await flight.do("users", query)
+
+        result = asyncio.run(scenario())
+        assert query.calls == 2
+        assert result["call"] == 2
+
+    def test_exception_reaches_every_waiter(self):
+        """Une erreur de l'appel partagé est remontée à tous les appelants"""
+        flight = SingleFlight("test")
+        error = ValueError("MySQL indisponible")
+        query = SlowQuery(error=error)
+
+        async def scenario():
+            return await asyncio.gather(
+                *[flight.do("users", query) for _ in range(CALLERS)], return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        assert query.calls == 1
+        assert all(result is error for result in results)
+        assert flight.stats()["inFlight"] == 0
+
+    def test_waiter_takes_over_when_owner_cancelled(self):
+        """Si l'appel partagé est annulé, un appelant en attente relance la requête"""
+        flight = SingleFlight("test")
+        query = SlowQuery()
+
+        async def scenario():
+            owner = asyncio.create_task(flight.do("users", query))
+            await asyncio.sleep(0)
+            waiters = [asyncio.create_task(flight.do("users", query)) for _ in range(CALLERS - 1)]
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            results = await asyncio.gather(*waiters)
+            with pytest.raises(asyncio.CancelledError):
+                await owner
+            return results
+
+        results = asyncio.run(scenario())
+        assert query.calls == 2
+        assert all(result["call"] == 2 for result in results)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])